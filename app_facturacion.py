@@ -12,6 +12,7 @@ import numpy as np
 from datetime import datetime, timedelta
 import plotly.express as px
 import plotly.graph_objects as go
+import plotly.io as pio
 from io import BytesIO
 import re
 import smtplib
@@ -20,6 +21,15 @@ from email.mime.multipart import MIMEMultipart
 import sqlite3
 from pathlib import Path
 import json
+import unicodedata
+from collections import Counter
+import hashlib
+import os
+import shutil
+import time
+import argparse
+import tempfile
+import threading
 
 # ============================================================================
 # 1. CONFIGURACIÓN INICIAL
@@ -86,6 +96,12 @@ if 'db_initialized' not in st.session_state:
 class ExcelNormalizer:
     """Normaliza Excel desorganizados a formato estándar"""
     
+    # Valor que devuelve detect_hospital_name cuando no encuentra el hospital
+    HOSPITAL_SIN_IDENTIFICAR = 'SIN IDENTIFICAR'
+    
+    # Filas de título que preceden al encabezado en las planillas de los efectores
+    FILAS_ENCABEZADO = 3
+    
     @staticmethod
     def detect_hospital_name(df, headers):
         """Detecta nombre de hospital en el Excel"""
@@ -94,7 +110,7 @@ class ExcelNormalizer:
                 for val in df.iloc[:, df.columns.get_loc(col)].head(10):
                     if pd.notna(val) and len(str(val)) > 3:
                         return str(val).strip()
-        return 'SIN IDENTIFICAR'
+        return ExcelNormalizer.HOSPITAL_SIN_IDENTIFICAR
     
     @staticmethod
     def detect_period(df, headers):
@@ -130,30 +146,123 @@ class ExcelNormalizer:
                     return 'AMBULATORIO H' if 'H' in val else 'AMBULATORIO C'
         return 'AMBULATORIO H'
     
+    @staticmethod
+    def text_mask(serie):
+        """Marca las celdas que llegaron como texto (y no como número de Excel)"""
+        tipo = pd.api.types.infer_dtype(serie, skipna=True) if serie.dtype == object else None
+        if tipo not in ('string', 'mixed', 'mixed-integer'):
+            return pd.Series(False, index=serie.index)
+        return serie.str.len().notna()
+    
+    @staticmethod
+    def parse_monto(serie):
+        """Convierte montos con formato argentino ($ 1.234.567,89) a float
+
+        Las celdas que Excel ya entrega como número se respetan tal cual;
+        solo el texto pasa por la limpieza de separadores.
+        """
+        es_texto = ExcelNormalizer.text_mask(serie)
+        if not es_texto.any():
+            return pd.to_numeric(serie, errors='coerce')
+        
+        numeros = pd.to_numeric(serie.where(~es_texto), errors='coerce')
+        
+        texto = serie.where(es_texto).str.replace(r'[\$\s]', '', regex=True)
+        con_coma = texto.str.contains(',', regex=False).fillna(False).astype(bool)
+        # Formato argentino bien formado: puntos agrupando de a tres y, opcionalmente, coma decimal
+        formato_ar = texto.str.fullmatch(r'-?(\d{1,3}(\.\d{3})+|\d+)(,\d+)?').fillna(False).astype(bool)
+        miles = texto.str.fullmatch(r'-?\d{1,3}(\.\d{3})+').fillna(False).astype(bool)
+        texto = texto.where(
+            ~(formato_ar & (con_coma | miles)),
+            texto.str.replace('.', '', regex=False).str.replace(',', '.', regex=False)
+        )
+        # Con coma pero sin formato argentino ('1,234.56', '1.23,4,5'): ambiguo, se rechaza
+        texto = texto.where(~(con_coma & ~formato_ar))
+        return numeros.where(~es_texto, pd.to_numeric(texto, errors='coerce'))
+    
+    @staticmethod
+    def validate(df_raw):
+        """Valida todas las filas en una sola pasada vectorizada
+
+        Devuelve (filas válidas tipadas, filas rechazadas con MOTIVO). Cada
+        fila rechazada lleva todos los códigos de error que le corresponden.
+        """
+        rnos = pd.to_numeric(df_raw['RNOS'], errors='coerce')
+        ordenes = pd.to_numeric(df_raw['CANTIDAD_ORDENES'], errors='coerce')
+        monto = ExcelNormalizer.parse_monto(df_raw['MONTO'])
+        
+        vacios = df_raw.isna()
+        for col in df_raw.columns:
+            es_texto = ExcelNormalizer.text_mask(df_raw[col])
+            if es_texto.any():
+                vacios[col] |= df_raw[col].where(es_texto).str.strip().eq('')
+        
+        errores = {
+            'RNOS_VACIO': vacios['RNOS'],
+            'RNOS_NO_NUMERICO': ~vacios['RNOS'] & rnos.isna(),
+            'RNOS_NO_ENTERO': rnos.notna() & (rnos % 1 != 0),
+            'ORDENES_NO_NUMERICO': ~vacios['CANTIDAD_ORDENES'] & ordenes.isna(),
+            'ORDENES_NEGATIVAS': ordenes < 0,
+            'ORDENES_NO_ENTERO': ordenes.notna() & (ordenes % 1 != 0),
+            'MONTO_VACIO': vacios['MONTO'],
+            'MONTO_INVALIDO': ~vacios['MONTO'] & monto.isna(),
+        }
+        matriz = pd.DataFrame(errores)
+        rechazada = matriz.any(axis=1)
+        
+        df_valid = pd.DataFrame({
+            'RNOS': rnos[~rechazada].astype(int),
+            'CANTIDAD_ORDENES': ordenes[~rechazada].fillna(0).astype(int),
+            'MONTO': monto[~rechazada]
+        })
+        
+        # Los textos de motivo se arman solo para las filas rechazadas
+        df_rechazos = df_raw[rechazada].copy()
+        # Fila tal como la ve el usuario en Excel (encabezado en la fila 4)
+        df_rechazos.insert(0, 'FILA_EXCEL', df_rechazos.index + ExcelNormalizer.FILAS_ENCABEZADO + 2)
+        motivo = pd.Series('', index=df_rechazos.index)
+        for codigo, mascara in matriz[rechazada].items():
+            motivo = motivo + np.where(mascara, codigo + ', ', '')
+        df_rechazos['MOTIVO'] = motivo.str.rstrip(', ')
+        
+        return df_valid, df_rechazos
+    
     @staticmethod
     def normalize(file_path):
-        """Normaliza un Excel a formato estándar"""
+        """Normaliza un Excel a formato estándar
+
+        Las filas que no pasan la validación no frenan la carga: se separan
+        en info['rechazos'] con su motivo y se cargan solo las válidas.
+        """
         try:
-            df = pd.read_excel(file_path, sheet_name=0, skiprows=3)
+            df = pd.read_excel(file_path, sheet_name=0, skiprows=ExcelNormalizer.FILAS_ENCABEZADO)
             df = df.dropna(how='all')
             
             hospital = ExcelNormalizer.detect_hospital_name(df, df.columns)
             period = ExcelNormalizer.detect_period(df, df.columns)
             prestacion = ExcelNormalizer.detect_prestacion(df, df.columns)
             
-            df_norm = pd.DataFrame()
+            df_raw = pd.DataFrame(index=df.index)
             
             # Mapeo flexible de columnas
             for col in df.columns:
                 col_upper = str(col).upper()
                 
                 if 'RNOS' in col_upper or 'OBRA SOCIAL' in col_upper:
-                    df_norm['RNOS'] = pd.to_numeric(df[col], errors='coerce').astype(int)
+                    df_raw['RNOS'] = df[col]
                 elif 'CANTIDAD' in col_upper and any(x in col_upper for x in ['ODA', 'ODI', 'ORDEN']):
-                    df_norm['CANTIDAD_ORDENES'] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(int)
+                    df_raw['CANTIDAD_ORDENES'] = df[col]
                 elif 'MONTO' in col_upper or 'TOTAL' in col_upper:
-                    monto_clean = df[col].astype(str).str.replace('$', '').str.replace(',', '.').str.strip()
-                    df_norm['MONTO'] = pd.to_numeric(monto_clean, errors='coerce').fillna(0)
+                    df_raw['MONTO'] = df[col]
+            
+            faltantes = [c for c in ['RNOS', 'MONTO'] if c not in df_raw.columns]
+            if faltantes:
+                raise ValueError(f"No se encontraron las columnas: {', '.join(faltantes)}")
+            if 'CANTIDAD_ORDENES' not in df_raw.columns:
+                # Planillas sin columna de órdenes: se cargan con 0 órdenes
+                df_raw['CANTIDAD_ORDENES'] = np.nan
+            
+            df_norm, df_rechazos = ExcelNormalizer.validate(df_raw)
             
             df_norm['NOMBRE_HOSPITAL'] = hospital
             df_norm['TIPO_PRESTACION'] = prestacion
@@ -172,6 +281,8 @@ class ExcelNormalizer:
                 'periodo': period,
                 'prestacion': prestacion,
                 'registros': len(df_norm),
+                'rechazados': len(df_rechazos),
+                'rechazos': df_rechazos,
                 'monto_total': df_norm['MONTO'].sum()
             }
         except Exception as e:
@@ -183,7 +294,13 @@ class ExcelNormalizer:
 
 class DatabaseManager:
     """Gestiona la base de datos SQLite"""
-    
+
+    # Días de mora a partir de los cuales cambia la severidad de una alerta
+    UMBRALES_SEVERIDAD = {'CRÍTICA': 90, 'ALTA': 60, 'MEDIA': 30}
+
+    # Bases de archivo adjuntas a la vez (SQLite limita a 10 por conexión)
+    MAX_ADJUNTAS = 9
+
     def __init__(self, db_path='facturacion.db'):
         self.db_path = db_path
         self.init_db()
@@ -209,9 +326,15 @@ class DatabaseManager:
             estado TEXT,
             mora_dias INTEGER,
             email_hospital TEXT,
+            hospital_id INTEGER,
             fecha_carga TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )''')
         
+        # Bases creadas antes del registro canónico no tienen hospital_id
+        columnas = [fila[1] for fila in c.execute("PRAGMA table_info(facturacion)")]
+        if 'hospital_id' not in columnas:
+            c.execute("ALTER TABLE facturacion ADD COLUMN hospital_id INTEGER")
+        
         c.execute('''CREATE TABLE IF NOT EXISTS contactos (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             nombre_hospital TEXT UNIQUE,
@@ -219,6 +342,39 @@ class DatabaseManager:
             telefono TEXT
         )''')
         
+        c.execute('''CREATE TABLE IF NOT EXISTS hospital_alias (
+            alias TEXT PRIMARY KEY,
+            contacto_id INTEGER NOT NULL REFERENCES contactos(id),
+            fecha_alta TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )''')
+
+        # Catálogo de períodos movidos a las bases anuales de archivo
+        c.execute('''CREATE TABLE IF NOT EXISTS periodos_archivados (
+            mes_presentacion TEXT PRIMARY KEY,
+            anio INTEGER,
+            registros INTEGER,
+            monto REAL,
+            fecha_archivo TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )''')
+        
+        # Contador de cambios: identifica el estado de los datos para la caché de reportes
+        c.execute('''CREATE TABLE IF NOT EXISTS datos_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL
+        )''')
+        c.execute("INSERT OR IGNORE INTO datos_version (id, version) VALUES (1, 0)")
+        for evento in ['INSERT', 'UPDATE', 'DELETE']:
+            c.execute(f'''CREATE TRIGGER IF NOT EXISTS facturacion_version_{evento.lower()}
+                AFTER {evento} ON facturacion
+                BEGIN
+                    UPDATE datos_version SET version = version + 1 WHERE id = 1;
+                END''')
+        
+        # Índice parcial (y cubriente): solo pendientes, que es lo que consultan las alertas
+        c.execute('''CREATE INDEX IF NOT EXISTS idx_facturacion_pendientes
+            ON facturacion (nombre_hospital, mes_presentacion, mora_dias, monto, cantidad_ordenes)
+            WHERE estado = 'PENDIENTE' ''')
+
         conn.commit()
         conn.close()
     
@@ -229,12 +385,52 @@ class DatabaseManager:
         conn.close()
         return True
     
-    def get_all_data(self):
-        """Obtiene todos los datos"""
+    def get_all_data(self, anios_archivados=None):
+        """Obtiene todos los datos
+
+        Por defecto lee solo la tabla operativa. Si se piden años archivados,
+        adjunta sus bases y une los registros históricos con UNION ALL.
+        """
         conn = sqlite3.connect(self.db_path)
-        df = pd.read_sql_query("SELECT * FROM facturacion ORDER BY fecha_carga DESC", conn)
+        anios = [a for a in (anios_archivados or []) if self.archive_path(a).exists()]
+        
+        if not anios:
+            df = pd.read_sql_query("SELECT * FROM facturacion ORDER BY fecha_carga DESC", conn)
+            conn.close()
+            return df
+        
+        columnas = ', '.join(self._columns(conn, 'main'))
+        partes = []
+        # SQLite admite un número limitado de bases adjuntas por conexión
+        for inicio in range(0, len(anios), DatabaseManager.MAX_ADJUNTAS):
+            consultas = [f"SELECT {columnas} FROM main.facturacion"] if inicio == 0 else []
+            esquemas = []
+            for anio in anios[inicio:inicio + DatabaseManager.MAX_ADJUNTAS]:
+                esquemas.append(self._attach_archive(conn, anio))
+                consultas.append(f"SELECT {columnas} FROM {esquemas[-1]}.facturacion")
+            partes.append(pd.read_sql_query(" UNION ALL ".join(consultas), conn))
+            for esquema in esquemas:
+                conn.execute(f"DETACH DATABASE {esquema}")
+        
         conn.close()
-        return df
+        return pd.concat(partes, ignore_index=True).sort_values('fecha_carga', ascending=False, ignore_index=True)
+    
+    def get_data_fingerprint(self):
+        """Resumen barato del estado de la tabla operativa (sin recorrer los datos en pandas)"""
+        conn = sqlite3.connect(self.db_path)
+        fila = conn.execute("""
+            SELECT (SELECT version FROM datos_version WHERE id = 1),
+                   COUNT(*), MAX(id), TOTAL(monto), MAX(fecha_carga)
+            FROM facturacion
+        """).fetchone()
+        conn.close()
+        return {
+            'version': fila[0],
+            'registros': fila[1],
+            'max_id': fila[2],
+            'monto': round(fila[3], 2),
+            'ultima_carga': fila[4]
+        }
     
     def get_pending_invoices(self):
         """Obtiene facturas pendientes"""
@@ -246,7 +442,71 @@ class DatabaseManager:
         """, conn)
         conn.close()
         return df
-    
+
+    def get_pending_alerts(self, mora_minima=0, monto_minimo=0, limite=None, desplazamiento=0):
+        """Agrupa pendientes por hospital y período directamente en SQL
+
+        Devuelve una fila por hospital/período con monto, órdenes, mora máxima
+        y severidad, más totales por hospital y conteo global para paginar.
+        """
+        umbrales = DatabaseManager.UMBRALES_SEVERIDAD
+        conn = sqlite3.connect(self.db_path)
+        df = pd.read_sql_query("""
+            WITH periodos AS (
+                SELECT nombre_hospital,
+                       mes_presentacion,
+                       COUNT(*) AS registros,
+                       SUM(monto) AS monto,
+                       SUM(cantidad_ordenes) AS cantidad_ordenes,
+                       MAX(COALESCE(mora_dias, 0)) AS mora_dias
+                FROM facturacion
+                WHERE estado = 'PENDIENTE'
+                GROUP BY nombre_hospital, mes_presentacion
+            ),
+            hospitales AS (
+                SELECT *,
+                       SUM(monto) OVER (PARTITION BY nombre_hospital) AS monto_hospital,
+                       MAX(mora_dias) OVER (PARTITION BY nombre_hospital) AS mora_max_hospital,
+                       COUNT(*) OVER (PARTITION BY nombre_hospital) AS periodos_hospital
+                FROM periodos
+            ),
+            filtradas AS (
+                SELECT * FROM hospitales
+                WHERE mora_dias >= :mora_minima AND monto >= :monto_minimo
+            )
+            SELECT RANK() OVER (ORDER BY mora_dias DESC, monto DESC) AS prioridad,
+                   nombre_hospital,
+                   mes_presentacion,
+                   registros,
+                   monto,
+                   cantidad_ordenes,
+                   mora_dias,
+                   CASE
+                       WHEN mora_dias >= :critica THEN 'CRÍTICA'
+                       WHEN mora_dias >= :alta THEN 'ALTA'
+                       WHEN mora_dias >= :media THEN 'MEDIA'
+                       ELSE 'BAJA'
+                   END AS severidad,
+                   monto_hospital,
+                   mora_max_hospital,
+                   periodos_hospital,
+                   SUM(registros) OVER () AS facturas_pendientes,
+                   COUNT(*) OVER () AS total_alertas
+            FROM filtradas
+            ORDER BY prioridad, nombre_hospital, mes_presentacion
+            LIMIT :limite OFFSET :desplazamiento
+        """, conn, params={
+            'mora_minima': mora_minima,
+            'monto_minimo': monto_minimo,
+            'critica': umbrales['CRÍTICA'],
+            'alta': umbrales['ALTA'],
+            'media': umbrales['MEDIA'],
+            'limite': -1 if limite is None else limite,
+            'desplazamiento': desplazamiento
+        })
+        conn.close()
+        return df
+
     def update_status(self, ids, status):
         """Actualiza estado de registros"""
         conn = sqlite3.connect(self.db_path)
@@ -255,9 +515,396 @@ class DatabaseManager:
             c.execute("UPDATE facturacion SET estado = ? WHERE id = ?", (status, id))
         conn.commit()
         conn.close()
+    
+    # ------------------------------------------------------------------------
+    # Archivo de períodos cerrados
+    # ------------------------------------------------------------------------
+    
+    def archive_path(self, anio):
+        """Ruta de la base SQLite de archivo para un año"""
+        return Path(self.db_path).parent / 'archivo' / f"facturacion_{int(anio)}.db"
+    
+    @staticmethod
+    def period_year(mes_presentacion, fecha_carga=None):
+        """Año de un período 'MES/AAAA'; si no lo trae, usa el de la fecha de carga"""
+        match = re.search(r'(\d{4})\s*$', str(mes_presentacion or ''))
+        if match:
+            return int(match.group(1))
+        if fecha_carga:
+            return pd.to_datetime(fecha_carga).year
+        return datetime.now().year
+    
+    @staticmethod
+    def _columns(conn, esquema):
+        """Columnas de facturacion en el esquema indicado"""
+        return [fila[1] for fila in conn.execute(f"PRAGMA {esquema}.table_info(facturacion)")]
+    
+    def _attach_archive(self, conn, anio):
+        """Adjunta la base del año y alinea su esquema con la tabla operativa"""
+        esquema = f"archivo_{int(anio)}"
+        ruta = self.archive_path(anio)
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        conn.execute("ATTACH DATABASE ? AS " + esquema, (str(ruta),))
+        
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {esquema}.facturacion AS SELECT * FROM main.facturacion WHERE 0")
+        conn.execute(f'''CREATE TABLE IF NOT EXISTS {esquema}.resumen_periodos (
+            mes_presentacion TEXT,
+            nombre_hospital TEXT,
+            tipo_prestacion TEXT,
+            registros INTEGER,
+            cantidad_ordenes INTEGER,
+            monto REAL,
+            fecha_archivo TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )''')
+        
+        # Columnas agregadas a la tabla operativa después de archivar (p. ej. hospital_id)
+        existentes = set(self._columns(conn, esquema))
+        for columna in self._columns(conn, 'main'):
+            if columna not in existentes:
+                conn.execute(f"ALTER TABLE {esquema}.facturacion ADD COLUMN {columna}")
+        return esquema
+    
+    @staticmethod
+    def _rebuild_summary(conn, esquema, periodo):
+        """Regenera resumen_periodos de un período a partir de las filas archivadas"""
+        conn.execute(f"DELETE FROM {esquema}.resumen_periodos WHERE mes_presentacion IS ?", (periodo,))
+        conn.execute(f"""
+            INSERT INTO {esquema}.resumen_periodos
+                (mes_presentacion, nombre_hospital, tipo_prestacion, registros, cantidad_ordenes, monto)
+            SELECT mes_presentacion, nombre_hospital, tipo_prestacion,
+                   COUNT(*), SUM(cantidad_ordenes), SUM(monto)
+            FROM {esquema}.facturacion
+            WHERE mes_presentacion IS ?
+            GROUP BY mes_presentacion, nombre_hospital, tipo_prestacion
+        """, (periodo,))
+    
+    def get_closed_periods(self):
+        """Períodos cuyos registros están todos PRESENTADO"""
+        conn = sqlite3.connect(self.db_path)
+        df = pd.read_sql_query("""
+            SELECT mes_presentacion,
+                   COUNT(*) AS registros,
+                   SUM(monto) AS monto,
+                   MAX(fecha_carga) AS ultima_carga
+            FROM facturacion
+            GROUP BY mes_presentacion
+            HAVING SUM(estado != 'PRESENTADO' OR estado IS NULL) = 0
+            ORDER BY ultima_carga
+        """, conn)
+        conn.close()
+        df['anio'] = [DatabaseManager.period_year(m, f) for m, f in zip(df['mes_presentacion'], df['ultima_carga'])]
+        return df
+    
+    def get_archived_years(self):
+        """Años con períodos archivados"""
+        conn = sqlite3.connect(self.db_path)
+        anios = [fila[0] for fila in conn.execute("SELECT DISTINCT anio FROM periodos_archivados ORDER BY anio DESC")]
+        conn.close()
+        return anios
+    
+    def archive_closed_periods(self):
+        """Mueve los períodos cerrados a su base anual junto con su resumen
+
+        Cada año se procesa en una transacción BEGIN IMMEDIATE sobre las bases
+        adjuntas; dentro de ella se vuelve a verificar que el período siga
+        cerrado, para no archivar pendientes cargados por otra sesión.
+        """
+        cerrados = self.get_closed_periods()
+        if len(cerrados) == 0:
+            return {'periodos': 0, 'registros': 0}
+        
+        conn = sqlite3.connect(self.db_path)
+        columnas = ', '.join(self._columns(conn, 'main'))
+        periodos = 0
+        registros = 0
+        
+        for anio, grupo in cerrados.groupby('anio'):
+            esquema = self._attach_archive(conn, anio)
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                for periodo in grupo['mes_presentacion']:
+                    abiertos = conn.execute("""
+                        SELECT COUNT(*) FROM main.facturacion
+                        WHERE mes_presentacion IS ? AND (estado != 'PRESENTADO' OR estado IS NULL)
+                    """, (periodo,)).fetchone()[0]
+                    if abiertos:
+                        continue
+                    
+                    conn.execute(f"""
+                        INSERT INTO {esquema}.facturacion ({columnas})
+                        SELECT {columnas} FROM main.facturacion
+                        WHERE mes_presentacion IS ? AND estado = 'PRESENTADO'
+                    """, (periodo,))
+                    # Resumen y catálogo se recalculan desde el archivo: un período
+                    # re-archivado (filas tardías) no duplica ni acumula parciales
+                    DatabaseManager._rebuild_summary(conn, esquema, periodo)
+                    conn.execute(f"""
+                        INSERT OR REPLACE INTO periodos_archivados (mes_presentacion, anio, registros, monto)
+                        SELECT ?, ?, COUNT(*), TOTAL(monto)
+                        FROM {esquema}.facturacion
+                        WHERE mes_presentacion IS ?
+                    """, (periodo, int(anio), periodo))
+                    registros += conn.execute("""
+                        DELETE FROM main.facturacion
+                        WHERE mes_presentacion IS ? AND estado = 'PRESENTADO'
+                    """, (periodo,)).rowcount
+                    periodos += 1
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                conn.execute(f"DETACH DATABASE {esquema}")
+        
+        # Devuelve al sistema las páginas liberadas por los DELETE. Si otra sesión
+        # tiene la base abierta no se puede compactar; el archivo ya quedó hecho
+        try:
+            conn.execute("VACUUM")
+        except sqlite3.OperationalError:
+            pass
+        conn.close()
+        return {'periodos': periodos, 'registros': registros}
 
 # ============================================================================
-# 5. SISTEMA DE ALERTAS Y EMAILS
+# 5. REGISTRO CANÓNICO DE HOSPITALES
+# ============================================================================
+
+class HospitalRegistry:
+    """Resuelve nombres libres de hospital contra la tabla contactos
+
+    Mantiene en memoria un diccionario de claves normalizadas (nombres
+    canónicos y alias aprendidos) y un índice invertido de trigramas para
+    las coincidencias aproximadas.
+    """
+    
+    # Palabras que no distinguen a un efector de otro
+    STOPWORDS = {'HOSPITAL', 'HOSP', 'DR', 'DRA', 'DE', 'DEL', 'LA', 'EL', 'LOS', 'LAS', 'Y', 'NRO', 'N'}
+    
+    # Similitud mínima para aceptar una coincidencia sin confirmación del usuario
+    UMBRAL_AUTOMATICO = 0.85
+    
+    # Ventaja mínima sobre el segundo candidato para no elegir entre empates
+    MARGEN_AUTOMATICO = 0.05
+    
+    def __init__(self, db):
+        self.db = db
+        self.load()
+    
+    @staticmethod
+    def normalize_name(nombre):
+        """Clave de comparación: sin acentos, mayúsculas, sin puntuación ni stopwords"""
+        texto = unicodedata.normalize('NFKD', str(nombre)).encode('ascii', 'ignore').decode().upper()
+        tokens = re.sub(r'[^A-Z0-9]+', ' ', texto).split()
+        return ' '.join(sorted(t for t in tokens if t not in HospitalRegistry.STOPWORDS))
+    
+    @staticmethod
+    def trigrams(clave):
+        """Trigramas de la clave con bordes marcados"""
+        texto = f"  {clave} "
+        return {texto[i:i + 3] for i in range(len(texto) - 2)}
+    
+    def load(self):
+        """Construye el índice en memoria desde contactos y hospital_alias"""
+        conn = sqlite3.connect(self.db.db_path)
+        contactos = conn.execute("SELECT id, nombre_hospital, email FROM contactos").fetchall()
+        alias = conn.execute("SELECT alias, contacto_id FROM hospital_alias").fetchall()
+        conn.close()
+        
+        self.hospitales = {id: {'nombre': nombre, 'email': email or ''} for id, nombre, email in contactos}
+        self.claves = {}
+        self.indice = {}
+        self.trigramas = {}
+        
+        for id, nombre, _ in contactos:
+            self._index(HospitalRegistry.normalize_name(nombre), id)
+        for alias_texto, contacto_id in alias:
+            if contacto_id in self.hospitales:
+                self._index(HospitalRegistry.normalize_name(alias_texto), contacto_id)
+    
+    def _index(self, clave, hospital_id):
+        """Agrega una clave normalizada al diccionario y al índice de trigramas"""
+        if not clave or clave in self.claves:
+            return
+        self.claves[clave] = hospital_id
+        self.trigramas[clave] = HospitalRegistry.trigrams(clave)
+        for trigrama in self.trigramas[clave]:
+            self.indice.setdefault(trigrama, set()).add(clave)
+    
+    @staticmethod
+    def numbers(clave):
+        """Tokens con dígitos de una clave ('CAPS ... 12' -> {'12'})"""
+        return {token for token in clave.split() if any(ch.isdigit() for ch in token)}
+    
+    def _ranking(self, clave):
+        """[(hospital_id, similitud, clave más parecida)] ordenado de mejor a peor"""
+        if clave in self.claves:
+            return [(self.claves[clave], 1.0, clave)]
+        
+        consulta = HospitalRegistry.trigrams(clave)
+        compartidos = Counter()
+        for trigrama in consulta:
+            for candidata in self.indice.get(trigrama, ()):
+                compartidos[candidata] += 1
+        
+        # Coeficiente de Dice; se queda con la mejor clave de cada hospital
+        mejores = {}
+        for candidata, comunes in compartidos.items():
+            similitud = 2 * comunes / (len(consulta) + len(self.trigramas[candidata]))
+            hospital_id = self.claves[candidata]
+            if similitud > mejores.get(hospital_id, (0, None))[0]:
+                mejores[hospital_id] = (similitud, candidata)
+        
+        # Desempate estable por nombre canónico, no por orden de inserción
+        return sorted(
+            ((hospital_id, similitud, candidata) for hospital_id, (similitud, candidata) in mejores.items()),
+            key=lambda x: (-x[1], str(self.hospitales[x[0]]['nombre']))
+        )
+    
+    def suggest(self, nombre, limite=5):
+        """Devuelve [(hospital_id, nombre canónico, similitud)] ordenado por similitud"""
+        ranking = self._ranking(HospitalRegistry.normalize_name(nombre))[:limite]
+        return [(hospital_id, self.hospitales[hospital_id]['nombre'], similitud) for hospital_id, similitud, _ in ranking]
+    
+    def exact_match(self, nombre):
+        """Hospital cuyo nombre canónico o alias coincide con la clave normalizada, o None"""
+        if not HospitalRegistry.is_valid_name(nombre):
+            return None
+        return self.claves.get(HospitalRegistry.normalize_name(nombre))
+    
+    @staticmethod
+    def is_valid_name(nombre):
+        """False para el marcador de hospital no detectado y nombres sin contenido"""
+        clave = HospitalRegistry.normalize_name(nombre)
+        return bool(clave) and clave != HospitalRegistry.normalize_name(ExcelNormalizer.HOSPITAL_SIN_IDENTIFICAR)
+    
+    def resolve(self, nombre):
+        """Devuelve (hospital_id, nombre canónico, similitud) o (None, None, 0) si requiere confirmación"""
+        if not HospitalRegistry.is_valid_name(nombre):
+            return None, None, 0
+        
+        clave = HospitalRegistry.normalize_name(nombre)
+        ranking = self._ranking(clave)
+        if not ranking:
+            return None, None, 0
+        
+        hospital_id, similitud, candidata = ranking[0]
+        segundo = ranking[1][1] if len(ranking) > 1 else 0
+        # Efectores que solo difieren en un número ('CAPS ... 1' / '... 11') nunca se unen solos
+        if candidata == clave or (
+            similitud >= HospitalRegistry.UMBRAL_AUTOMATICO
+            and similitud - segundo >= HospitalRegistry.MARGEN_AUTOMATICO
+            and HospitalRegistry.numbers(clave) == HospitalRegistry.numbers(candidata)
+        ):
+            return hospital_id, self.hospitales[hospital_id]['nombre'], similitud
+        return None, None, 0
+    
+    def email(self, hospital_id):
+        """Email de contacto registrado para el hospital"""
+        return self.hospitales.get(hospital_id, {}).get('email', '')
+    
+    def learn_alias(self, alias, hospital_id):
+        """Persiste un alias confirmado por el usuario y lo suma al índice"""
+        if not HospitalRegistry.is_valid_name(alias):
+            raise ValueError(f"\"{alias}\" no es un nombre de hospital válido")
+        conn = sqlite3.connect(self.db.db_path)
+        conn.execute("INSERT OR REPLACE INTO hospital_alias (alias, contacto_id) VALUES (?, ?)",
+                     (str(alias).strip(), hospital_id))
+        conn.commit()
+        conn.close()
+        self._index(HospitalRegistry.normalize_name(alias), hospital_id)
+    
+    def register(self, nombre, email='', telefono=''):
+        """Da de alta un hospital nuevo en contactos y devuelve su id"""
+        if not HospitalRegistry.is_valid_name(nombre):
+            raise ValueError(f"\"{nombre}\" no es un nombre de hospital válido")
+        conn = sqlite3.connect(self.db.db_path)
+        conn.execute("INSERT OR IGNORE INTO contactos (nombre_hospital, email, telefono) VALUES (?, ?, ?)",
+                     (str(nombre).strip(), email, telefono))
+        hospital_id = conn.execute("SELECT id FROM contactos WHERE nombre_hospital = ?",
+                                   (str(nombre).strip(),)).fetchone()[0]
+        conn.commit()
+        conn.close()
+        self.load()
+        return hospital_id
+    
+    def recanonicalize(self):
+        """Reescribe nombre_hospital y hospital_id de los registros existentes
+
+        Solo toca nombres cuya clave normalizada es un nombre canónico o un
+        alias confirmado. Las coincidencias aproximadas no se escriben: se
+        devuelven en 'sugerencias' para que el usuario las confirme como alias.
+        Se aplica a la tabla operativa y a las bases anuales de archivo.
+        """
+        conn = sqlite3.connect(self.db.db_path)
+        anios = self.db.get_archived_years()
+        
+        nombres = {fila[0] for fila in conn.execute("SELECT DISTINCT nombre_hospital FROM facturacion")}
+        for anio in anios:
+            esquema = self.db._attach_archive(conn, anio)
+            nombres |= {fila[0] for fila in conn.execute(f"SELECT DISTINCT nombre_hospital FROM {esquema}.facturacion")}
+            conn.execute(f"DETACH DATABASE {esquema}")
+        
+        reescrituras = {}
+        sugerencias = []
+        sin_resolver = []
+        for nombre in sorted(nombres, key=str):
+            hospital_id = self.exact_match(nombre)
+            if hospital_id is not None:
+                reescrituras[nombre] = hospital_id
+                continue
+            candidatos = self.suggest(nombre, limite=1) if HospitalRegistry.is_valid_name(nombre) else []
+            if candidatos:
+                sugerencias.append((nombre,) + candidatos[0])
+            else:
+                sin_resolver.append(nombre)
+        
+        def aplicar(esquema):
+            """Aplica las reescrituras a la tabla facturacion del esquema"""
+            cambios = 0
+            for nombre, hospital_id in reescrituras.items():
+                canonico = self.hospitales[hospital_id]['nombre']
+                cambios += conn.execute(f"""
+                    UPDATE {esquema}.facturacion
+                    SET nombre_hospital = ?,
+                        hospital_id = ?,
+                        email_hospital = COALESCE(NULLIF(email_hospital, ''), ?)
+                    WHERE nombre_hospital = ?
+                      AND (nombre_hospital != ? OR hospital_id IS NOT ?)
+                """, (canonico, hospital_id, self.email(hospital_id), nombre, canonico, hospital_id)).rowcount
+            return cambios
+        
+        actualizados = aplicar('main')
+        conn.commit()
+        
+        archivados = 0
+        for anio in anios:
+            esquema = self.db._attach_archive(conn, anio)
+            try:
+                cambios = aplicar(esquema)
+                if cambios:
+                    # Los resúmenes agrupan por nombre: se rehacen con los nombres canónicos
+                    periodos = [fila[0] for fila in conn.execute(
+                        f"SELECT DISTINCT mes_presentacion FROM {esquema}.facturacion")]
+                    for periodo in periodos:
+                        DatabaseManager._rebuild_summary(conn, esquema, periodo)
+                conn.commit()
+                archivados += cambios
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                conn.execute(f"DETACH DATABASE {esquema}")
+        
+        conn.close()
+        return {
+            'actualizados': actualizados,
+            'archivados': archivados,
+            'sugerencias': sugerencias,
+            'sin_resolver': sin_resolver
+        }
+
+# ============================================================================
+# 6. SISTEMA DE ALERTAS Y EMAILS
 # ============================================================================
 
 class AlertSystem:
@@ -311,7 +958,303 @@ class AlertSystem:
             return False
 
 # ============================================================================
-# 6. INTERFACE PRINCIPAL
+# 7. REPORTES EJECUTIVOS PRE-RENDERIZADOS
+# ============================================================================
+
+class ExecutiveReports:
+    """Arma las métricas, gráficos y tablas de los reportes estándar"""
+    
+    @staticmethod
+    def dashboard(df_data):
+        """Panel de control: métricas generales, top hospitales y resumen"""
+        pendientes = int((df_data['estado'] == 'PENDIENTE').sum())
+        
+        # Top 10 hospitales por monto
+        top_hospitals = df_data.groupby('nombre_hospital')['monto'].sum().nlargest(10)
+        fig_top = px.bar(
+            x=top_hospitals.values,
+            y=top_hospitals.index,
+            orientation='h',
+            title='Top 10 Hospitales por Facturación',
+            labels={'x': 'Monto ($)', 'y': 'Hospital'},
+            color=top_hospitals.values,
+            color_continuous_scale='Viridis'
+        )
+        
+        # Distribución por tipo prestación
+        dist_prestacion = df_data.groupby('tipo_prestacion')['monto'].sum()
+        fig_prestacion = px.pie(
+            values=dist_prestacion.values,
+            names=dist_prestacion.index,
+            title='Distribución por Tipo de Prestación',
+            color_discrete_sequence=['#667eea', '#764ba2', '#f093fb']
+        )
+        
+        resumen = df_data.groupby('nombre_hospital').agg({
+            'monto': ['sum', 'count'],
+            'cantidad_ordenes': 'sum'
+        }).round(2)
+        resumen.columns = ['Monto Total', 'Registros', 'Total Órdenes']
+        resumen['% del Total'] = (resumen['Monto Total'] / resumen['Monto Total'].sum() * 100).round(2)
+        resumen = resumen.sort_values('Monto Total', ascending=False)
+        
+        return {
+            'metricas': {
+                'monto_total': float(df_data['monto'].sum()),
+                'registros': len(df_data),
+                'ordenes_total': int(df_data['cantidad_ordenes'].sum()),
+                'ordenes_promedio': float(df_data['cantidad_ordenes'].mean()),
+                'hospitales': int(df_data['nombre_hospital'].nunique()),
+                'pendientes': pendientes
+            },
+            'figuras': {'top_hospitales': fig_top, 'distribucion_prestacion': fig_prestacion},
+            'tablas': {'resumen_hospital': resumen}
+        }
+    
+    @staticmethod
+    def analisis(df_filtered):
+        """Análisis ejecutivo: evolución mensual, órdenes y ranking por hospital"""
+        # Evolución mensual
+        evoluccion_mes = df_filtered.groupby('mes_presentacion')['monto'].sum()
+        fig_evolucion = px.line(
+            x=evoluccion_mes.index,
+            y=evoluccion_mes.values,
+            markers=True,
+            title='Evolución de Facturación Mensual',
+            labels={'x': 'Mes', 'y': 'Monto ($)'}
+        )
+        
+        # Órdenes por hospital
+        ordenes_hosp = df_filtered.groupby('nombre_hospital')['cantidad_ordenes'].sum().nlargest(8)
+        fig_ordenes = px.bar(
+            x=ordenes_hosp.index,
+            y=ordenes_hosp.values,
+            title='Top 8 Hospitales por Cantidad de Órdenes',
+            labels={'x': 'Hospital', 'y': 'Órdenes'}
+        )
+        
+        # Ranking detallado
+        ranking = df_filtered.groupby('nombre_hospital').agg({
+            'monto': 'sum',
+            'cantidad_ordenes': 'sum'
+        }).round(2)
+        ranking['Promedio por Orden'] = (ranking['monto'] / ranking['cantidad_ordenes']).round(2)
+        ranking['% del Total'] = (ranking['monto'] / ranking['monto'].sum() * 100).round(2)
+        ranking.columns = ['Facturación Total', 'Total Órdenes', 'Promedio por Orden', '% del Total']
+        ranking = ranking.sort_values('Facturación Total', ascending=False)
+        ranking.insert(0, 'Ranking', range(1, len(ranking) + 1))
+        
+        return {
+            'metricas': {
+                'monto_total': float(df_filtered['monto'].sum()),
+                'ordenes_total': int(df_filtered['cantidad_ordenes'].sum()),
+                'hospitales': int(df_filtered['nombre_hospital'].nunique())
+            },
+            'figuras': {'evolucion_mensual': fig_evolucion, 'ordenes_hospital': fig_ordenes},
+            'tablas': {'ranking': ranking, 'evolucion_mensual': evoluccion_mes.reset_index()}
+        }
+    
+    @staticmethod
+    def excel(hojas):
+        """Genera un Excel en memoria con una hoja por DataFrame"""
+        buffer = BytesIO()
+        with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+            for nombre, df in hojas.items():
+                df.to_excel(writer, sheet_name=nombre)
+        return buffer.getvalue()
+
+
+class ReportScheduler:
+    """Pre-renderiza los reportes estándar en una caché en disco
+
+    Cada generación se guarda en una carpeta cuyo nombre es el hash del
+    estado de los datos, así que dos sesiones (o el proceso programado)
+    que ven los mismos datos comparten los mismos archivos.
+    """
+    
+    # Subir al cambiar el contenido o formato de los reportes
+    VERSION = 1
+    
+    # Generaciones que se conservan en disco
+    CONSERVAR = 5
+    
+    # Antigüedad a partir de la cual una carpeta temporal se considera abandonada
+    TEMPORAL_MAX_SEGUNDOS = 3600
+    
+    # Claves que se están generando en segundo plano (compartido entre sesiones)
+    _en_curso = set()
+    _lock = threading.Lock()
+    
+    def __init__(self, db, cache_dir=None):
+        self.db = db
+        self.cache_dir = Path(cache_dir) if cache_dir else Path(db.db_path).parent / 'reportes'
+    
+    def cache_key(self):
+        """Hash del estado de la tabla operativa y de la versión de los reportes"""
+        huella = dict(self.db.get_data_fingerprint(), reportes=ReportScheduler.VERSION)
+        return hashlib.sha256(json.dumps(huella, sort_keys=True, default=str).encode()).hexdigest()[:32]
+    
+    def load(self, clave=None):
+        """Lee los reportes ya generados para los datos actuales, o None si no existen"""
+        ruta = self.cache_dir / (clave or self.cache_key())
+        if not (ruta / 'manifest.json').exists():
+            return None
+        
+        manifest = json.loads((ruta / 'manifest.json').read_text(encoding='utf-8'))
+        reportes = {'ruta': ruta, 'manifest': manifest}
+        for seccion, contenido in manifest['secciones'].items():
+            reportes[seccion] = {
+                'metricas': contenido['metricas'],
+                'figuras': {nombre: pio.from_json((ruta / f"grafico_{nombre}.json").read_text(encoding='utf-8'))
+                            for nombre in contenido['figuras']},
+                'tablas': {nombre: pd.read_json(ruta / f"tabla_{nombre}.json", orient='table')
+                           for nombre in contenido['tablas']}
+            }
+        return reportes
+    
+    def get_reports(self):
+        """Reportes de la caché, o None si faltan
+
+        Ante un fallo de caché lanza la generación en segundo plano y la
+        interfaz calcula la vista en vivo mientras tanto.
+        """
+        reportes = self.load()
+        if reportes is None:
+            self.render_async()
+        return reportes
+    
+    def render_async(self):
+        """Genera los reportes en un hilo aparte, una sola vez por clave"""
+        clave = self.cache_key()
+        with ReportScheduler._lock:
+            if clave in ReportScheduler._en_curso or (self.cache_dir / clave / 'manifest.json').exists():
+                return
+            ReportScheduler._en_curso.add(clave)
+        
+        def generar():
+            try:
+                self.render()
+            finally:
+                with ReportScheduler._lock:
+                    ReportScheduler._en_curso.discard(clave)
+        
+        threading.Thread(target=generar, daemon=True).start()
+    
+    def render(self):
+        """Genera los reportes estándar si no existen para el estado actual de los datos
+
+        Devuelve la clave de caché, o None si no hay datos cargados.
+        """
+        clave = self.cache_key()
+        destino = self.cache_dir / clave
+        if (destino / 'manifest.json').exists():
+            return clave
+        
+        df_data = self.db.get_all_data()
+        if len(df_data) == 0:
+            return None
+        
+        # Se escribe en una carpeta temporal y se renombra al final: nunca se sirve a medio generar
+        # Carpeta única por llamada: las sesiones de Streamlit son hilos del mismo proceso
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        temporal = Path(tempfile.mkdtemp(dir=self.cache_dir, prefix=f".tmp-{clave}-"))
+        
+        try:
+            secciones = {
+                'dashboard': ExecutiveReports.dashboard(df_data),
+                'analisis': ExecutiveReports.analisis(df_data)
+            }
+            manifest = {
+                'clave': clave,
+                'generado': datetime.now().isoformat(timespec='seconds'),
+                'opciones': {
+                    'hospitales': df_data['nombre_hospital'].unique().tolist(),
+                    'prestaciones': df_data['tipo_prestacion'].unique().tolist(),
+                    'estados': df_data['estado'].unique().tolist()
+                },
+                'secciones': {}
+            }
+            
+            for seccion, reporte in secciones.items():
+                for nombre, fig in reporte['figuras'].items():
+                    (temporal / f"grafico_{nombre}.json").write_text(fig.to_json(), encoding='utf-8')
+                    fig.write_html(temporal / f"grafico_{nombre}.html", include_plotlyjs='cdn')
+                for nombre, tabla in reporte['tablas'].items():
+                    tabla.to_json(temporal / f"tabla_{nombre}.json", orient='table', force_ascii=False)
+                manifest['secciones'][seccion] = {
+                    'metricas': reporte['metricas'],
+                    'figuras': list(reporte['figuras']),
+                    'tablas': list(reporte['tablas'])
+                }
+            
+            analisis = secciones['analisis']['tablas']
+            archivos = {
+                'analisis_facturacion.xlsx': {'Ranking': analisis['ranking'], 'Detalle': df_data},
+                'evolucion_mensual.xlsx': {'Evolución Mensual': analisis['evolucion_mensual']},
+                'alertas_pendientes.xlsx': {'Alertas': self.db.get_pending_alerts()}
+            }
+            for nombre, hojas in archivos.items():
+                (temporal / nombre).write_bytes(ExecutiveReports.excel(hojas))
+            
+            (temporal / 'manifest.json').write_text(json.dumps(manifest, ensure_ascii=False, default=str), encoding='utf-8')
+        except Exception:
+            # Sin esto cada reintento fallido dejaría otra carpeta temporal huérfana
+            shutil.rmtree(temporal, ignore_errors=True)
+            raise
+        
+        try:
+            os.replace(temporal, destino)
+        except OSError:
+            # Otra sesión generó la misma clave primero
+            shutil.rmtree(temporal, ignore_errors=True)
+        
+        self.prune(clave)
+        return clave
+    
+    def prune(self, clave_actual):
+        """Borra las generaciones más viejas y las carpetas temporales abandonadas"""
+        carpetas = [ruta for ruta in self.cache_dir.iterdir() if ruta.is_dir()]
+        
+        # Temporales de generaciones interrumpidas (proceso caído, disco lleno)
+        limite = time.time() - ReportScheduler.TEMPORAL_MAX_SEGUNDOS
+        for ruta in carpetas:
+            if ruta.name.startswith('.tmp-') and ruta.stat().st_mtime < limite:
+                shutil.rmtree(ruta, ignore_errors=True)
+        
+        generaciones = sorted(
+            (ruta for ruta in carpetas if not ruta.name.startswith('.tmp-') and ruta.name != clave_actual),
+            key=lambda ruta: ruta.stat().st_mtime,
+            reverse=True
+        )
+        for ruta in generaciones[ReportScheduler.CONSERVAR - 1:]:
+            shutil.rmtree(ruta, ignore_errors=True)
+    
+    @staticmethod
+    def next_run(horarios, desde=None):
+        """Próxima fecha/hora de ejecución para una lista de horarios 'HH:MM'"""
+        desde = desde or datetime.now()
+        candidatos = []
+        for horario in horarios:
+            hora, minuto = (int(x) for x in horario.split(':'))
+            inicio = desde.replace(hour=hora, minute=minuto, second=0, microsecond=0)
+            candidatos.append(inicio if inicio > desde else inicio + timedelta(days=1))
+        return min(candidatos)
+    
+    def run(self, horarios=None):
+        """Genera los reportes ahora y, si hay horarios, vuelve a hacerlo en cada uno"""
+        while True:
+            clave = self.render()
+            if clave:
+                print(f"[{datetime.now():%Y-%m-%d %H:%M}] Reportes disponibles en {self.cache_dir / clave}")
+            else:
+                print(f"[{datetime.now():%Y-%m-%d %H:%M}] Sin datos cargados: no se generaron reportes")
+            
+            if not horarios:
+                return clave
+            time.sleep(max(0, (ReportScheduler.next_run(horarios) - datetime.now()).total_seconds()))
+
+# ============================================================================
+# 8. INTERFACE PRINCIPAL
 # ============================================================================
 
 def main():
@@ -333,6 +1276,16 @@ def main():
     # Inicializa base de datos
     db = DatabaseManager()
     
+    # Histórico: los períodos archivados solo se leen si se piden explícitamente
+    anios_archivados = db.get_archived_years()
+    anios_historicos = []
+    if anios_archivados:
+        anios_historicos = st.sidebar.multiselect(
+            "📦 Incluir años archivados:",
+            anios_archivados,
+            default=[]
+        )
+    
     # ========================================================================
     # SECCIÓN: DASHBOARD
     # ========================================================================
@@ -340,75 +1293,54 @@ def main():
     if menu == "🏠 Dashboard":
         st.subheader("Panel de Control Ejecutivo")
         
-        df_data = db.get_all_data()
+        # Vista estándar desde la caché; con años archivados o sin caché se calcula en vivo
+        reportes = None if anios_historicos else ReportScheduler(db).get_reports()
+        if reportes:
+            reporte = reportes['dashboard']
+        else:
+            df_data = db.get_all_data(anios_historicos)
+            reporte = ExecutiveReports.dashboard(df_data) if len(df_data) > 0 else None
         
-        if len(df_data) > 0:
+        if reporte:
+            metricas = reporte['metricas']
             col1, col2, col3, col4 = st.columns(4)
             
             with col1:
                 st.metric("💰 Monto Total Facturado", 
-                         f"${df_data['monto'].sum():,.2f}",
-                         delta=f"{len(df_data)} registros")
+                         f"${metricas['monto_total']:,.2f}",
+                         delta=f"{metricas['registros']} registros")
             
             with col2:
                 st.metric("📋 Total de Órdenes",
-                         f"{df_data['cantidad_ordenes'].sum():,}",
-                         delta=f"Promedio: {df_data['cantidad_ordenes'].mean():.1f}")
+                         f"{metricas['ordenes_total']:,}",
+                         delta=f"Promedio: {metricas['ordenes_promedio']:.1f}")
             
             with col3:
-                hospitales = df_data['nombre_hospital'].nunique()
                 st.metric("🏢 Hospitales",
-                         f"{hospitales}",
+                         f"{metricas['hospitales']}",
                          delta=f"de 33 registrados")
             
             with col4:
-                pendientes = len(df_data[df_data['estado'] == 'PENDIENTE'])
+                pendientes = metricas['pendientes']
                 st.metric("⏳ Pendientes",
                          f"{pendientes}",
-                         delta=f"{((pendientes/len(df_data)*100) if len(df_data)>0 else 0):.1f}%")
+                         delta=f"{((pendientes/metricas['registros']*100) if metricas['registros']>0 else 0):.1f}%")
             
             # Gráficos
             st.markdown("---")
             col1, col2 = st.columns(2)
             
             with col1:
-                # Top 10 hospitales por monto
-                top_hospitals = df_data.groupby('nombre_hospital')['monto'].sum().nlargest(10)
-                fig = px.bar(
-                    x=top_hospitals.values,
-                    y=top_hospitals.index,
-                    orientation='h',
-                    title='Top 10 Hospitales por Facturación',
-                    labels={'x': 'Monto ($)', 'y': 'Hospital'},
-                    color=top_hospitals.values,
-                    color_continuous_scale='Viridis'
-                )
-                st.plotly_chart(fig, use_container_width=True)
+                st.plotly_chart(reporte['figuras']['top_hospitales'], use_container_width=True)
             
             with col2:
-                # Distribución por tipo prestación
-                dist_prestacion = df_data.groupby('tipo_prestacion')['monto'].sum()
-                fig = px.pie(
-                    values=dist_prestacion.values,
-                    names=dist_prestacion.index,
-                    title='Distribución por Tipo de Prestación',
-                    color_discrete_sequence=['#667eea', '#764ba2', '#f093fb']
-                )
-                st.plotly_chart(fig, use_container_width=True)
+                st.plotly_chart(reporte['figuras']['distribucion_prestacion'], use_container_width=True)
             
             # Tabla resumen
             st.markdown("---")
             st.subheader("📊 Resumen por Hospital")
             
-            resumen = df_data.groupby('nombre_hospital').agg({
-                'monto': ['sum', 'count'],
-                'cantidad_ordenes': 'sum'
-            }).round(2)
-            resumen.columns = ['Monto Total', 'Registros', 'Total Órdenes']
-            resumen['% del Total'] = (resumen['Monto Total'] / resumen['Monto Total'].sum() * 100).round(2)
-            resumen = resumen.sort_values('Monto Total', ascending=False)
-            
-            st.dataframe(resumen, use_container_width=True)
+            st.dataframe(reporte['tablas']['resumen_hospital'], use_container_width=True)
         
         else:
             st.info("📭 No hay datos cargados. Comienza por cargar un Excel.")
@@ -436,9 +1368,56 @@ def main():
                 if info['status'] == 'success':
                     st.success(f"✅ Excel normalizado correctamente")
                     
+                    # Resuelve el nombre libre del Excel contra el registro canónico
+                    registry = HospitalRegistry(db)
+                    hospital_id, hospital_canonico, _ = registry.resolve(info['hospital'])
+                    
+                    if hospital_id is None and not HospitalRegistry.is_valid_name(info['hospital']):
+                        # No se detectó el hospital: se elige uno registrado o se escribe un nombre real,
+                        # sin aprender alias para el marcador
+                        st.warning("🏥 No se pudo detectar el hospital en el Excel. "
+                                   "Elige uno registrado o registra su nombre antes de cargar.")
+                        
+                        registrados = {datos['nombre']: id for id, datos in sorted(
+                            registry.hospitales.items(), key=lambda x: str(x[1]['nombre']))}
+                        eleccion = st.selectbox("Hospital:", ["— Seleccionar —"] + list(registrados))
+                        
+                        if eleccion in registrados:
+                            hospital_id, hospital_canonico = registrados[eleccion], eleccion
+                        else:
+                            nuevo = st.text_input("...o registra un hospital nuevo:")
+                            if st.button("➕ Registrar Hospital", key="registrar_hospital"):
+                                if HospitalRegistry.is_valid_name(nuevo):
+                                    # Tras recargar aparece en la lista para seleccionarlo
+                                    registry.register(nuevo)
+                                    st.rerun()
+                                else:
+                                    st.error("❌ Escribe el nombre real del hospital")
+                    
+                    elif hospital_id is None:
+                        st.warning(f"🏥 \"{info['hospital']}\" no coincide con ningún hospital registrado. "
+                                   f"Confirma a cuál corresponde antes de cargar.")
+                        
+                        opciones = {f"{nombre} ({similitud:.0%})": id
+                                    for id, nombre, similitud in registry.suggest(info['hospital'])}
+                        opciones[f"➕ Registrar \"{info['hospital']}\" como hospital nuevo"] = None
+                        eleccion = st.selectbox("Hospital:", list(opciones))
+                        
+                        if st.button("✅ Confirmar Hospital", key="confirmar_hospital"):
+                            if opciones[eleccion] is None:
+                                registry.register(info['hospital'])
+                            else:
+                                registry.learn_alias(info['hospital'], opciones[eleccion])
+                            st.rerun()
+                    
+                    if hospital_id is not None:
+                        df_normalized['NOMBRE_HOSPITAL'] = hospital_canonico
+                        df_normalized['HOSPITAL_ID'] = hospital_id
+                        df_normalized['EMAIL_HOSPITAL'] = registry.email(hospital_id)
+                    
                     col1, col2, col3 = st.columns(3)
                     with col1:
-                        st.metric("Hospital", info['hospital'])
+                        st.metric("Hospital", hospital_canonico or info['hospital'])
                     with col2:
                         st.metric("Período", info['periodo'])
                     with col3:
@@ -449,9 +1428,27 @@ def main():
                     
                     st.dataframe(df_normalized, use_container_width=True)
                     
-                    if st.button("✅ Cargar a Base de Datos", key="cargar_bd"):
+                    if info['rechazados'] > 0:
+                        st.warning(f"⚠️ {info['rechazados']} filas rechazadas por validación. "
+                                   f"Se cargarán solo las {info['registros']} filas válidas.")
+                        st.dataframe(info['rechazos'], use_container_width=True)
+                        
+                        buffer = BytesIO()
+                        with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+                            info['rechazos'].to_excel(writer, sheet_name='Rechazos', index=False)
+                        
+                        st.download_button(
+                            label="📥 Descargar Filas Rechazadas",
+                            data=buffer.getvalue(),
+                            file_name=f"rechazos_{Path(uploaded_file.name).stem}_{datetime.now().strftime('%Y%m%d')}.xlsx",
+                            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                        )
+                    
+                    if hospital_id is not None and st.button("✅ Cargar a Base de Datos", key="cargar_bd"):
                         db.insert_records(df_normalized)
                         st.success("✅ Datos cargados correctamente en la BD")
+                        # Los reportes se regeneran en segundo plano, sin bloquear la carga
+                        ReportScheduler(db).render_async()
                         Path(temp_path).unlink()
                 else:
                     st.error(f"❌ Error: {info['mensaje']}")
@@ -463,105 +1460,107 @@ def main():
     elif menu == "📊 Análisis Ejecutivo":
         st.subheader("Análisis Ejecutivo Detallado")
         
-        df_data = db.get_all_data()
+        # Las opciones de filtro salen de la caché salvo que se pida histórico o aún no exista
+        reportes = None if anios_historicos else ReportScheduler(db).get_reports()
+        if reportes:
+            df_data = None
+            opciones = reportes['manifest']['opciones']
+        else:
+            df_data = db.get_all_data(anios_historicos)
+            opciones = {
+                'hospitales': df_data['nombre_hospital'].unique(),
+                'prestaciones': df_data['tipo_prestacion'].unique(),
+                'estados': df_data['estado'].unique()
+            } if len(df_data) > 0 else None
         
-        if len(df_data) > 0:
+        if opciones:
             # Filtros
             col1, col2, col3 = st.columns(3)
             
             with col1:
                 hospital_filter = st.multiselect(
                     "Filtrar por Hospital:",
-                    df_data['nombre_hospital'].unique(),
-                    default=df_data['nombre_hospital'].unique()
+                    opciones['hospitales'],
+                    default=opciones['hospitales']
                 )
             
             with col2:
                 prestacion_filter = st.multiselect(
                     "Filtrar por Prestación:",
-                    df_data['tipo_prestacion'].unique(),
-                    default=df_data['tipo_prestacion'].unique()
+                    opciones['prestaciones'],
+                    default=opciones['prestaciones']
                 )
             
             with col3:
                 estado_filter = st.multiselect(
                     "Filtrar por Estado:",
-                    df_data['estado'].unique(),
-                    default=df_data['estado'].unique()
+                    opciones['estados'],
+                    default=opciones['estados']
                 )
             
-            # Aplica filtros
-            df_filtered = df_data[
-                (df_data['nombre_hospital'].isin(hospital_filter)) &
-                (df_data['tipo_prestacion'].isin(prestacion_filter)) &
-                (df_data['estado'].isin(estado_filter))
-            ]
+            personalizado = reportes is None or any(
+                len(seleccion) != len(opciones[clave])
+                for seleccion, clave in [(hospital_filter, 'hospitales'),
+                                         (prestacion_filter, 'prestaciones'),
+                                         (estado_filter, 'estados')]
+            )
+            
+            if not personalizado:
+                # Sin filtros: reporte pre-renderizado
+                reporte = reportes['analisis']
+                excel_analisis = (reportes['ruta'] / 'analisis_facturacion.xlsx').read_bytes()
+            else:
+                if df_data is None:
+                    df_data = db.get_all_data()
+                
+                # Aplica filtros
+                df_filtered = df_data[
+                    (df_data['nombre_hospital'].isin(hospital_filter)) &
+                    (df_data['tipo_prestacion'].isin(prestacion_filter)) &
+                    (df_data['estado'].isin(estado_filter))
+                ]
+                reporte = ExecutiveReports.analisis(df_filtered) if len(df_filtered) > 0 else None
+                if reporte:
+                    excel_analisis = ExecutiveReports.excel({
+                        'Ranking': reporte['tablas']['ranking'],
+                        'Detalle': df_filtered
+                    })
             
-            if len(df_filtered) > 0:
+            if reporte:
+                metricas = reporte['metricas']
+                
                 # Métricas
                 col1, col2, col3 = st.columns(3)
                 
                 with col1:
-                    st.metric("💰 Total Filtrado", f"${df_filtered['monto'].sum():,.2f}")
+                    st.metric("💰 Total Filtrado", f"${metricas['monto_total']:,.2f}")
                 
                 with col2:
-                    st.metric("📋 Órdenes Filtradas", f"{df_filtered['cantidad_ordenes'].sum():,}")
+                    st.metric("📋 Órdenes Filtradas", f"{metricas['ordenes_total']:,}")
                 
                 with col3:
-                    st.metric("🏢 Hospitales Filtrados", df_filtered['nombre_hospital'].nunique())
+                    st.metric("🏢 Hospitales Filtrados", metricas['hospitales'])
                 
                 # Gráficos avanzados
                 st.markdown("---")
                 col1, col2 = st.columns(2)
                 
                 with col1:
-                    # Evolución mensual
-                    evoluccion_mes = df_filtered.groupby('mes_presentacion')['monto'].sum()
-                    fig = px.line(
-                        x=evoluccion_mes.index,
-                        y=evoluccion_mes.values,
-                        markers=True,
-                        title='Evolución de Facturación Mensual',
-                        labels={'x': 'Mes', 'y': 'Monto ($)'}
-                    )
-                    st.plotly_chart(fig, use_container_width=True)
+                    st.plotly_chart(reporte['figuras']['evolucion_mensual'], use_container_width=True)
                 
                 with col2:
-                    # Órdenes por hospital
-                    ordenes_hosp = df_filtered.groupby('nombre_hospital')['cantidad_ordenes'].sum().nlargest(8)
-                    fig = px.bar(
-                        x=ordenes_hosp.index,
-                        y=ordenes_hosp.values,
-                        title='Top 8 Hospitales por Cantidad de Órdenes',
-                        labels={'x': 'Hospital', 'y': 'Órdenes'}
-                    )
-                    st.plotly_chart(fig, use_container_width=True)
+                    st.plotly_chart(reporte['figuras']['ordenes_hospital'], use_container_width=True)
                 
                 # Ranking detallado
                 st.markdown("---")
                 st.subheader("📊 Ranking Detallado de Facturación")
                 
-                ranking = df_filtered.groupby('nombre_hospital').agg({
-                    'monto': 'sum',
-                    'cantidad_ordenes': 'sum'
-                }).round(2)
-                ranking['Promedio por Orden'] = (ranking['monto'] / ranking['cantidad_ordenes']).round(2)
-                ranking['% del Total'] = (ranking['monto'] / ranking['monto'].sum() * 100).round(2)
-                ranking.columns = ['Facturación Total', 'Total Órdenes', 'Promedio por Orden', '% del Total']
-                ranking = ranking.sort_values('Facturación Total', ascending=False)
-                ranking.insert(0, 'Ranking', range(1, len(ranking) + 1))
-                
-                st.dataframe(ranking, use_container_width=True)
+                st.dataframe(reporte['tablas']['ranking'], use_container_width=True)
                 
                 # Descargar análisis
-                buffer = BytesIO()
-                with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-                    ranking.to_excel(writer, sheet_name='Ranking')
-                    df_filtered.to_excel(writer, sheet_name='Detalle')
-                
                 st.download_button(
                     label="📥 Descargar Análisis Excel",
-                    data=buffer.getvalue(),
+                    data=excel_analisis,
                     file_name=f"analisis_facturacion_{datetime.now().strftime('%Y%m%d')}.xlsx",
                     mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
                 )
@@ -573,20 +1572,49 @@ def main():
     elif menu == "⚠️ Alertas Pendientes":
         st.subheader("Facturaciones Pendientes de Presentación")
         
-        df_pending = db.get_pending_invoices()
-        
-        if len(df_pending) > 0:
-            st.warning(f"⚠️ {len(df_pending)} facturas pendientes de presentación")
-            
-            # Agrupa por hospital y mes
-            alertas = df_pending.groupby(['nombre_hospital', 'mes_presentacion']).agg({
-                'monto': 'sum',
-                'cantidad_ordenes': 'sum',
-                'mora_dias': 'first'
-            }).reset_index()
-            alertas = alertas.sort_values('mora_dias', ascending=False)
-            
-            st.dataframe(alertas, use_container_width=True)
+        # Umbrales y paginación
+        col1, col2, col3, col4 = st.columns(4)
+
+        with col1:
+            mora_minima = st.number_input("Mora mínima (días):", value=0, min_value=0, max_value=3650)
+
+        with col2:
+            monto_minimo = st.number_input("Monto mínimo ($):", value=0.0, min_value=0.0, step=1000.0)
+
+        with col3:
+            por_pagina = st.selectbox("Alertas por página:", [25, 50, 100, 500], index=1)
+
+        with col4:
+            pagina = st.number_input("Página:", value=1, min_value=1)
+
+        alertas = db.get_pending_alerts(
+            mora_minima=mora_minima,
+            monto_minimo=monto_minimo,
+            limite=por_pagina,
+            desplazamiento=(pagina - 1) * por_pagina
+        )
+
+        if len(alertas) > 0:
+            total_alertas = int(alertas['total_alertas'].iloc[0])
+            total_paginas = (total_alertas - 1) // por_pagina + 1
+            st.warning(f"⚠️ {int(alertas['facturas_pendientes'].iloc[0])} facturas pendientes de presentación "
+                       f"en {total_alertas} hospital/período (página {pagina} de {total_paginas})")
+
+            st.dataframe(
+                alertas.drop(columns=['facturas_pendientes', 'total_alertas']),
+                use_container_width=True,
+                hide_index=True
+            )
+
+            # Reporte completo pre-renderizado (sin umbrales ni paginación)
+            reportes = ReportScheduler(db).load()
+            if reportes:
+                st.download_button(
+                    label="📥 Descargar Reporte Completo de Alertas",
+                    data=(reportes['ruta'] / 'alertas_pendientes.xlsx').read_bytes(),
+                    file_name=f"alertas_pendientes_{datetime.now().strftime('%Y%m%d')}.xlsx",
+                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                )
             
             st.markdown("---")
             st.subheader("📧 Enviar Notificaciones")
@@ -594,6 +1622,12 @@ def main():
             if st.button("📤 Enviar Alertas a Hospitales"):
                 st.info("Las alertas serían enviadas a los contactos registrados (feature en desarrollo)")
         
+        elif pagina > 1:
+            st.info("📄 La página seleccionada no tiene alertas. Vuelve a la página 1.")
+
+        elif mora_minima > 0 or monto_minimo > 0:
+            st.success("✅ No hay alertas que superen los umbrales seleccionados")
+
         else:
             st.success("✅ No hay alertas pendientes - Toda la facturación está presentada")
     
@@ -604,9 +1638,9 @@ def main():
     elif menu == "📧 Enviar Intimaciones":
         st.subheader("Sistema de Intimaciones Automáticas")
         
-        df_pending = db.get_pending_invoices()
+        alertas = db.get_pending_alerts()
         
-        if len(df_pending) > 0:
+        if len(alertas) > 0:
             st.info("Configura los parámetros para enviar intimaciones")
             
             col1, col2 = st.columns(2)
@@ -648,8 +1682,9 @@ Direccion General de Seguridad Social, Financiamiento y Recupero"""
             if st.button("📧 Enviar Intimaciones (Simulación)", key="enviar_intimaciones"):
                 st.info("✅ Sistema de envío configurado. Para activar envío real, configura credenciales SMTP en secrets.")
                 
-                for idx, row in df_pending.iterrows():
-                    st.write(f"📧 {row['nombre_hospital']} - {row['mes_presentacion']}")
+                for row in alertas.itertuples(index=False):
+                    st.write(f"📧 {row.nombre_hospital} - {row.mes_presentacion} "
+                             f"({row.severidad}, {row.mora_dias} días de mora)")
         
         else:
             st.success("✅ No hay pendientes para intimar")
@@ -682,6 +1717,10 @@ Direccion General de Seguridad Social, Financiamiento y Recupero"""
             Tablas: 
             - facturacion
             - contactos
+            - hospital_alias
+            - periodos_archivados (bases anuales en archivo/)
+            
+            Reportes pre-renderizados: carpeta reportes/
             
             Tamaño: Optimizado para 11.000+ registros
             """)
@@ -699,6 +1738,67 @@ Direccion General de Seguridad Social, Financiamiento y Recupero"""
             st.metric("Hospitales", df_data['nombre_hospital'].nunique() if len(df_data) > 0 else 0)
         with col3:
             st.metric("Monto Total", f"${df_data['monto'].sum():,.2f}" if len(df_data) > 0 else "$0.00")
+        
+        st.markdown("---")
+        
+        # Archivo de períodos cerrados
+        st.markdown("### 📦 Archivo de Períodos Cerrados")
+        cerrados = db.get_closed_periods()
+        
+        if len(cerrados) > 0:
+            st.write(f"{len(cerrados)} períodos completamente presentados | "
+                     f"{int(cerrados['registros'].sum())} registros listos para archivar")
+            st.dataframe(cerrados, use_container_width=True, hide_index=True)
+            
+            if st.button("📦 Archivar Períodos Cerrados", key="archivar_periodos"):
+                with st.spinner("Moviendo períodos a las bases anuales..."):
+                    resultado = db.archive_closed_periods()
+                st.success(f"✅ {resultado['periodos']} períodos archivados ({resultado['registros']} registros)")
+        else:
+            st.info("No hay períodos cerrados pendientes de archivar")
+        
+        if anios_archivados:
+            st.write("Años archivados: " + ", ".join(map(str, anios_archivados)))
+        
+        st.markdown("---")
+        
+        # Registro canónico de hospitales
+        st.markdown("### 🏥 Registro de Hospitales")
+        registry = HospitalRegistry(db)
+        st.write(f"{len(registry.hospitales)} hospitales registrados | {len(registry.claves)} nombres conocidos")
+        
+        if st.button("🔄 Re-canonicalizar Registros Existentes", key="recanonicalizar"):
+            with st.spinner("Unificando nombres de hospital..."):
+                st.session_state.recanonicalizacion = registry.recanonicalize()
+        
+        resultado = st.session_state.get('recanonicalizacion')
+        if resultado:
+            st.success(f"✅ {resultado['actualizados']} registros operativos y {resultado['archivados']} "
+                       f"archivados actualizados al nombre canónico")
+            
+            if resultado['sugerencias']:
+                # Coincidencias aproximadas: no se tocan hasta que el usuario las confirme
+                st.warning("⚠️ Coincidencias aproximadas sin aplicar. Confirma solo las correctas:")
+                st.dataframe(
+                    pd.DataFrame(resultado['sugerencias'],
+                                 columns=['Nombre en Registros', 'ID', 'Hospital Canónico', 'Similitud']),
+                    use_container_width=True,
+                    hide_index=True
+                )
+                
+                opciones = {f"{nombre} → {canonico} ({similitud:.0%})": (nombre, id)
+                            for nombre, id, canonico, similitud in resultado['sugerencias']}
+                confirmadas = st.multiselect("Confirmar como alias:", list(opciones))
+                
+                if confirmadas and st.button("✅ Confirmar y Re-canonicalizar", key="confirmar_alias"):
+                    for eleccion in confirmadas:
+                        registry.learn_alias(*opciones[eleccion])
+                    st.session_state.recanonicalizacion = registry.recanonicalize()
+                    st.rerun()
+            
+            if resultado['sin_resolver']:
+                st.warning("⚠️ Nombres sin coincidencia (confírmalos al cargar un Excel): "
+                           + ", ".join(map(str, resultado['sin_resolver'])))
     
     # ========================================================================
     # SECCIÓN: VER DATOS
@@ -707,7 +1807,7 @@ Direccion General de Seguridad Social, Financiamiento y Recupero"""
     elif menu == "📋 Ver Datos":
         st.subheader("Vista Completa de Datos")
         
-        df_data = db.get_all_data()
+        df_data = db.get_all_data(anios_historicos)
         
         if len(df_data) > 0:
             # Opciones de visualización
@@ -762,4 +1862,17 @@ Direccion General de Seguridad Social, Financiamiento y Recupero"""
     """, unsafe_allow_html=True)
 
 if __name__ == "__main__":
-    main()
+    # Modo sin interfaz: python app_facturacion.py --reportes [--horarios 07:00,13:00]
+    parser = argparse.ArgumentParser(description="Facturación Hospitalaria EPSA")
+    parser.add_argument('--reportes', action='store_true',
+                        help="Genera los reportes ejecutivos en disco y termina (o queda programado)")
+    parser.add_argument('--horarios', default='',
+                        help="Horarios HH:MM separados por coma para regenerar los reportes")
+    parser.add_argument('--db', default='facturacion.db', help="Ruta de la base SQLite")
+    args, _ = parser.parse_known_args()
+    
+    if args.reportes:
+        horarios = [h.strip() for h in args.horarios.split(',') if h.strip()]
+        ReportScheduler(DatabaseManager(args.db)).run(horarios)
+    else:
+        main()